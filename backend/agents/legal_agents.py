@@ -1,4 +1,5 @@
 from crewai import Agent, LLM
+from typing import Optional
 from config import config
 
 llm = LLM(
@@ -7,9 +8,20 @@ llm = LLM(
     api_key=config.GROQ_API_KEY
 )
 
+small_llm = LLM(
+    model=config.SMALL_MODEL_NAME,
+    temperature=config.TEMPERATURE,
+    api_key=config.GROQ_API_KEY
+)
+
 class LegalAgents:
     @staticmethod
-    def legal_analyst_agent():
+    def llm_for(tier: str) -> LLM:
+        """Return the LLM backing a routing tier ("small" or "large")"""
+        return small_llm if tier == "small" else llm
+
+    @staticmethod
+    def legal_analyst_agent(model: Optional[LLM] = None):
         """Agent specialized in analyzing legal documents and contracts"""
         return Agent(
             role="Senior Legal Analyst",
@@ -18,14 +30,14 @@ class LegalAgents:
             in contract law, commercial agreements, and legal document review. You have a keen eye for
             detail and can quickly identify problematic clauses, ambiguous language, and potential legal
             risks. You explain complex legal concepts in plain English.""",
-            llm=llm,
+            llm=model or llm,
             verbose=True,
             allow_delegation=False,
             max_iter=3
         )
 
     @staticmethod
-    def contract_reviewer_agent():
+    def contract_reviewer_agent(model: Optional[LLM] = None):
         """Agent specialized in contract review and clause extraction"""
         return Agent(
             role="Contract Review Specialist",
@@ -34,14 +46,14 @@ class LegalAgents:
             employment agreements, and service contracts. You have reviewed thousands of contracts
             and can quickly spot unfavorable terms, missing protections, and areas of concern.
             You provide clear, practical recommendations for contract improvements.""",
-            llm=llm,
+            llm=model or llm,
             verbose=True,
             allow_delegation=False,
             max_iter=3
         )
 
     @staticmethod
-    def legal_researcher_agent():
+    def legal_researcher_agent(model: Optional[LLM] = None):
         """Agent specialized in legal research and case law"""
         return Agent(
             role="Legal Research Specialist",
@@ -50,14 +62,14 @@ class LegalAgents:
             and legal precedents across multiple jurisdictions. You excel at finding relevant legal
             authorities, analyzing their applicability, and providing clear, well-cited legal opinions.
             You stay current with recent legal developments and emerging trends.""",
-            llm=llm,
+            llm=model or llm,
             verbose=True,
             allow_delegation=False,
             max_iter=3
         )
 
     @staticmethod
-    def compliance_advisor_agent():
+    def compliance_advisor_agent(model: Optional[LLM] = None):
         """Agent specialized in compliance and regulatory matters"""
         return Agent(
             role="Compliance & Regulatory Advisor",
@@ -66,14 +78,14 @@ class LegalAgents:
             industry standards, and compliance best practices. You help organizations navigate complex
             regulatory landscapes, identify compliance gaps, and develop practical compliance strategies.
             You stay updated on regulatory changes and emerging compliance requirements.""",
-            llm=llm,
+            llm=model or llm,
             verbose=True,
             allow_delegation=False,
             max_iter=3
         )
 
     @staticmethod
-    def risk_assessment_agent():
+    def risk_assessment_agent(model: Optional[LLM] = None):
         """Agent specialized in legal risk assessment"""
         return Agent(
             role="Legal Risk Assessment Expert",
@@ -82,14 +94,14 @@ class LegalAgents:
             You have extensive experience in identifying, analyzing, and quantifying legal risks across
             various business contexts. You provide clear risk ratings and practical mitigation strategies
             to help organizations make informed decisions.""",
-            llm=llm,
+            llm=model or llm,
             verbose=True,
             allow_delegation=False,
             max_iter=3
         )
 
     @staticmethod
-    def legal_consultant_agent():
+    def legal_consultant_agent(model: Optional[LLM] = None):
         """General legal consultant agent for Q&A"""
         return Agent(
             role="General Legal Consultant",
@@ -99,7 +111,7 @@ class LegalAgents:
             You excel at explaining complex legal concepts in plain language and providing practical
             guidance. You always clarify that you provide information, not legal advice, and recommend
             consulting with a licensed attorney for specific legal matters.""",
-            llm=llm,
+            llm=model or llm,
             verbose=True,
             allow_delegation=True,
             max_iter=3
@@ -9,9 +9,67 @@ class Config:
     SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
     MODEL_NAME = os.getenv("MODEL_NAME", "groq/llama-3.3-70b-versatile")
 
+    SMALL_MODEL_NAME = os.getenv("SMALL_MODEL_NAME", "groq/llama-3.1-8b-instant")
+
     MAX_TOKENS = 8000
     TEMPERATURE = 0.7
 
+    OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() == "true"
+    OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+    OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", str(os.cpu_count() or 2)))
+    OCR_DPI = 300
+    OCR_MIN_PAGE_CHARS = 25
+    OCR_CACHE_SIZE = 2048
+
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+    PREFETCH_ANALYSES = ["contract_review", "clause_extraction"]
+    PREFETCH_MAX_WORKERS = 1
+    PREFETCH_MAX_LOAD = int(os.getenv("PREFETCH_MAX_LOAD", "4"))
+    PREFETCH_CACHE_SIZE = 256
+    # How long other workers wait on a prefetch another worker has in progress
+    PREFETCH_PENDING_TTL = 600
+
+    ROUTING_ENABLED = os.getenv("ROUTING_ENABLED", "true").lower() == "true"
+    ROUTING_SMALL_TASKS = ["general_consultation", "clause_extraction", "analyze_document"]
+    ROUTING_SMALL_MAX_CHARS = 6000
+    ROUTING_COMPLEXITY_THRESHOLD = 3
+    ROUTING_MIN_OUTPUT_CHARS = 200
+
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "legal-ai-backend")
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file")
+    TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+    TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+
+    WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "50"))
+    WRITE_BEHIND_FLUSH_MS = int(os.getenv("WRITE_BEHIND_FLUSH_MS", "250"))
+    WRITE_BEHIND_MAX_RETRIES = 3
+    WRITE_BEHIND_SPILL_FILE = os.getenv("WRITE_BEHIND_SPILL_FILE", "write_behind_spill.jsonl")
+
+    SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "legal_ai_cache.db")
+
+    SERVER_HOST = os.getenv("HOST", "0.0.0.0")
+    SERVER_PORT = int(os.getenv("PORT", "8000"))
+    WORKERS = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+    # Agent calls can run for minutes; both timeouts must exceed the slowest
+    # one, and a SIGTERM must drain any call the worker timeout would allow
+    WORKER_TIMEOUT = int(os.getenv("WORKER_TIMEOUT", "300"))
+    GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", str(WORKER_TIMEOUT)))
+
+    COMPLIANCE_MAX_PARALLEL = int(os.getenv("COMPLIANCE_MAX_PARALLEL", "8"))
+    COMPLIANCE_MAX_CELLS = 40
+    COMPLIANCE_CACHE_SIZE = 1024
+
+    PRESCREEN_ENABLED = os.getenv("PRESCREEN_ENABLED", "true").lower() == "true"
+    # Contracts shorter than this are sent to the agent whole
+    PRESCREEN_MIN_CHARS = 4000
+
+    # Blended input/output price in USD per million tokens, used to log routing savings
+    MODEL_COST_PER_MILLION_TOKENS = {
+        "small": 0.065,
+        "large": 0.69
+    }
+
     CONVERSATION_TYPES = {
         "general": "General Legal Consultation",
         "contract_review": "Contract Review & Analysis",
@@ -26,7 +84,8 @@ class Config:
         "clause_extraction": "Clause Extraction",
         "risk_assessment": "Risk Assessment",
         "compliance_check": "Compliance Check",
-        "legal_summary": "Legal Summary"
+        "legal_summary": "Legal Summary",
+        "key_terms": "Key Terms (instant, no AI)"
     }
 
 config = Config()
@@ -1,3 +1,5 @@
-from .legal_crew import LegalCrew
+from .legal_crew import LegalCrew, SpeculativeRunCancelled, usage_meter
+from .analysis_prefetcher import AnalysisPrefetcher
+from .model_router import ModelRouter
 
-__all__ = ['LegalCrew']
+__all__ = ['LegalCrew', 'SpeculativeRunCancelled', 'usage_meter', 'AnalysisPrefetcher', 'ModelRouter']
@@ -0,0 +1,186 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from config import config
+from .legal_crew import SpeculativeRunCancelled, speculative_abort
+
+
+class AnalysisPrefetcher:
+    """Speculatively runs the analyses users usually request after an upload and caches them by document hash"""
+
+    def __init__(
+        self,
+        crew,
+        analysis_types: List[str],
+        max_workers: int,
+        max_load: int,
+        current_load: Callable[[], int],
+        cache_size: int,
+        shared_cache=None
+    ):
+        self.crew = crew
+        self.analysis_types = analysis_types
+        self.max_load = max_load
+        self.current_load = current_load
+        self.cache_size = cache_size
+        self.shared_cache = shared_cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._runs: "OrderedDict[Tuple[str, str], Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    @staticmethod
+    def content_hash(document_content: str) -> str:
+        """Hash used to key cached analyses for a document's text"""
+        return hashlib.sha256(document_content.encode("utf-8")).hexdigest()
+
+    def overloaded(self) -> bool:
+        """Whether foreground traffic is high enough that speculative work should be dropped"""
+        return self.current_load() >= self.max_load
+
+    def _should_abort(self) -> bool:
+        return self._stopping.is_set() or self.overloaded()
+
+    def prefetch(self, content_hash: str, document_content: str, document_type: str) -> List[str]:
+        """Queue the likely analyses for a document, returning the analysis types that were queued"""
+        if not document_content or self._stopping.is_set() or self.overloaded():
+            return []
+
+        queued = []
+        with self._lock:
+            for analysis_type in self.analysis_types:
+                key = (content_hash, analysis_type)
+                if key in self._runs:
+                    continue
+                self._runs[key] = self._executor.submit(
+                    self._run, key, document_content, document_type
+                )
+                queued.append(analysis_type)
+            self._evict()
+        return queued
+
+    def get(self, content_hash: str, analysis_type: str) -> Optional[Future]:
+        """Return the cached or running prefetch for a document analysis, if any"""
+        with self._lock:
+            future = self._runs.get((content_hash, analysis_type))
+            if future is None:
+                return self._from_shared_cache(content_hash, analysis_type)
+            # A job still queued behind another prefetch would make the caller
+            # wait for both runs; cancel it and let the caller run cold.
+            # cancel() fails only if the job started in the meantime.
+            if not future.running() and not future.done() and future.cancel():
+                del self._runs[(content_hash, analysis_type)]
+                return None
+            if future.cancelled() or (future.done() and (future.exception() is not None or future.result() is None)):
+                del self._runs[(content_hash, analysis_type)]
+                return None
+            self._runs.move_to_end((content_hash, analysis_type))
+            return future
+
+    def shutdown(self) -> None:
+        """Drop queued speculative work and stop the worker threads
+
+        A running job stops at its next abort check. The executor thread is
+        joined at interpreter exit, so this keeps a worker from outliving
+        its graceful timeout on speculative work.
+        """
+        self._stopping.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _pending_key(key: Tuple[str, str]) -> str:
+        return f"{key[0]}:{key[1]}:pending"
+
+    def _drop(self, content_hash: str) -> None:
+        # Forget every run for the document; queued jobs see they are gone
+        # and return without calling the model. Futures are not cancelled so
+        # callers already attached get None and fall back to a cold run.
+        with self._lock:
+            for key in [key for key in self._runs if key[0] == content_hash]:
+                del self._runs[key]
+
+    def _run(self, key: Tuple[str, str], document_content: str, document_type: str) -> Optional[str]:
+        content_hash, analysis_type = key
+        token = speculative_abort.set(self._should_abort)
+        started = False
+        try:
+            with self._lock:
+                if key not in self._runs:
+                    return None
+
+            # Load is re-checked when the job starts and again between crew
+            # runs; a crew already talking to the model cannot be interrupted.
+            if self._should_abort():
+                self._drop(content_hash)
+                return None
+
+            # Only runs that have started are advertised to other workers;
+            # queued ones could sit behind another prefetch for minutes
+            if self.shared_cache is not None:
+                self.shared_cache.set(self._pending_key(key), str(time.time()))
+                started = True
+
+            try:
+                result = self.crew.run_analysis(analysis_type, document_content, document_type)
+            except SpeculativeRunCancelled:
+                self._drop(content_hash)
+                return None
+
+            if self.shared_cache is not None and result:
+                self.shared_cache.set(f"{content_hash}:{analysis_type}", result)
+            return result
+        finally:
+            speculative_abort.reset(token)
+            if started:
+                self.shared_cache.delete(self._pending_key(key))
+
+    def _from_shared_cache(self, content_hash: str, analysis_type: str) -> Optional[Future]:
+        # Another worker process may have run, or be running, the prefetch
+        # for this upload
+        if self.shared_cache is None:
+            return None
+
+        future = Future()
+        result = self.shared_cache.get(f"{content_hash}:{analysis_type}")
+        if result is not None:
+            future.set_result(result)
+            return future
+
+        started = self.shared_cache.get(self._pending_key((content_hash, analysis_type)))
+        if started is None or time.time() - float(started) > config.PREFETCH_PENDING_TTL:
+            return None
+
+        threading.Thread(
+            target=self._wait_for_shared,
+            args=(future, content_hash, analysis_type, float(started) + config.PREFETCH_PENDING_TTL),
+            daemon=True
+        ).start()
+        return future
+
+    def _wait_for_shared(self, future: Future, content_hash: str, analysis_type: str, deadline: float) -> None:
+        # Resolves to None when the other worker finishes without a result,
+        # abandons the run, or dies and lets the marker expire
+        while time.time() < deadline:
+            result = self.shared_cache.get(f"{content_hash}:{analysis_type}")
+            if result is not None:
+                future.set_result(result)
+                return
+            if self.shared_cache.get(self._pending_key((content_hash, analysis_type))) is None:
+                future.set_result(self.shared_cache.get(f"{content_hash}:{analysis_type}"))
+                return
+            time.sleep(0.5)
+        future.set_result(None)
+
+    def _evict(self) -> None:
+        # Only completed runs are evicted so callers attached to an
+        # in-flight run never lose it.
+        excess = len(self._runs) - self.cache_size
+        if excess <= 0:
+            return
+        for key in [key for key, future in self._runs.items() if future.done()][:excess]:
+            del self._runs[key]
+
@@ -1,137 +1,309 @@
 from crewai import Crew, Process
 from agents import LegalAgents
 from tasks import LegalTasks
-from typing import Dict, Any
+from tools import ContractPrescreener
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+import contextvars
+import hashlib
+import time
+
+from config import config
+from shared_cache import SharedCache
+from tracing import span
+from .model_router import ModelRouter
+
+# Set by the prefetcher while it runs speculative work; returns True when the
+# run should be abandoned so foreground requests get the model.
+speculative_abort: ContextVar[Optional[Callable[[], bool]]] = ContextVar("speculative_abort", default=None)
+
+# Set by API handlers to collect the token usage of every crew run made for
+# a request, so it can be billed to the user.
+usage_meter: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("usage_meter", default=None)
+
+
+class SpeculativeRunCancelled(Exception):
+    """Raised between crew runs when speculative work is abandoned under load"""
+
 
 class LegalCrew:
     """Main crew orchestrator for legal AI assistant"""
 
     def __init__(self):
         self.agents = LegalAgents()
+        self.router = ModelRouter()
+        self.compliance_cache = SharedCache(config.SHARED_CACHE_PATH, "compliance", config.COMPLIANCE_CACHE_SIZE)
+
+    def _kickoff(self, agents: List, tasks: List, tier: str) -> Tuple[str, Optional[int]]:
+        """Run a crew, returning its output and the total tokens crewai reports for it"""
+        with span("crew.kickoff", **{"crew.agents": len(agents), "crew.tasks": len(tasks)}) as current:
+            crew = Crew(
+                agents=agents,
+                tasks=tasks,
+                process=Process.sequential,
+                verbose=True
+            )
+
+            result = crew.kickoff()
+
+            usage = getattr(result, "token_usage", None)
+            if usage is not None:
+                current.set_attributes({
+                    "llm.tokens.prompt": usage.prompt_tokens,
+                    "llm.tokens.completion": usage.completion_tokens,
+                    "llm.tokens.total": usage.total_tokens,
+                    "llm.requests": usage.successful_requests
+                })
+                meter = usage_meter.get()
+                if meter is not None:
+                    meter.append({
+                        "model_used": config.SMALL_MODEL_NAME if tier == "small" else config.MODEL_NAME,
+                        "tokens_used": usage.total_tokens,
+                        "cost": usage.total_tokens * config.MODEL_COST_PER_MILLION_TOKENS[tier] / 1_000_000
+                    })
+            return str(result), usage.total_tokens if usage is not None else None
+
+    @staticmethod
+    def _check_speculative_abort() -> None:
+        abort = speculative_abort.get()
+        if abort is not None and abort():
+            raise SpeculativeRunCancelled("speculative run abandoned under load")
+
+    def _run_routed(self, task_type: str, content: str, build: Callable[[Any], Tuple[List, List]]) -> str:
+        """Run a crew on the routed model tier, escalating to the large model if the small one fails"""
+        with span(f"crew.{task_type}", **{"crew.task_type": task_type, "crew.input_chars": len(content)}) as current:
+            self._check_speculative_abort()
+            decision = self.router.route(task_type, content)
+            tier = decision["tier"]
+
+            started = time.perf_counter()
+            tokens = None
+            if tier == "small":
+                # Escalate when the small model errors (rate limit, context
+                # length, crewai failure) as well as when its answer is unusable
+                try:
+                    result, tokens = self._kickoff(*self._build(build, tier), tier)
+                    failure = None if self.router.validate(result) else "validation"
+                except Exception as e:
+                    result, failure = "", f"error: {e}"
+
+                if failure:
+                    decision["escalation_reason"] = failure
+                    self.router.record(
+                        decision, tier, content, result, (time.perf_counter() - started) * 1000, tokens, failed=True
+                    )
+                    self._check_speculative_abort()
+                    decision["escalated"] = True
+                    tier = "large"
+                    started = time.perf_counter()
+
+            if tier == "large":
+                result, tokens = self._kickoff(*self._build(build, tier), tier)
+
+            self.router.record(decision, tier, content, result, (time.perf_counter() - started) * 1000, tokens)
+            current.set_attributes({
+                "llm.tier": tier,
+                "llm.routing_reason": decision["reason"],
+                "llm.escalated": decision.get("escalated", False),
+                "crew.output_chars": len(result)
+            })
+            return result
+
+    def _build(self, build: Callable[[Any], Tuple[List, List]], tier: str) -> Tuple[List, List]:
+        with span("tasks.build", **{"llm.tier": tier}):
+            return build(self.agents.llm_for(tier))
 
     def analyze_document(self, document_content: str, document_type: str) -> str:
         """Analyze a legal document"""
-        agent = self.agents.legal_analyst_agent()
-        task = LegalTasks.analyze_document_task(agent, document_content, document_type)
+        def build(model):
+            agent = self.agents.legal_analyst_agent(model)
+            return [agent], [LegalTasks.analyze_document_task(agent, document_content, document_type)]
+
+        return self._run_routed("analyze_document", document_content, build)
+
+    def _prescreen(self, contract_content: str) -> Tuple[str, str]:
+        """Pre-screen a contract, returning the content to send the agent and a summary of the findings"""
+        if not config.PRESCREEN_ENABLED or not contract_content:
+            return contract_content, ""
+
+        with span("document.prescreen", **{"document.chars": len(contract_content)}) as current:
+            prescreen = ContractPrescreener.prescreen(contract_content)
+            focused = ContractPrescreener.focus(prescreen)
 
-        crew = Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
-        )
+            # Only trim long contracts, and only when the flagged sections are
+            # a meaningful reduction.
+            if len(contract_content) < config.PRESCREEN_MIN_CHARS or not focused or len(focused) > 0.8 * len(contract_content):
+                focused = contract_content
 
-        result = crew.kickoff()
-        return str(result)
+            current.set_attributes({
+                "prescreen.sections": len(prescreen["sections"]),
+                "prescreen.focused_chars": len(focused),
+                "prescreen.elapsed_ms": prescreen["elapsed_ms"]
+            })
+            return focused, ContractPrescreener.format_summary(prescreen)
 
     def review_contract(self, contract_content: str, contract_type: str) -> str:
         """Review a contract comprehensively"""
-        agent = self.agents.contract_reviewer_agent()
-        task = LegalTasks.review_contract_task(agent, contract_content, contract_type)
+        content, summary = self._prescreen(contract_content)
 
-        crew = Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
-        )
+        def build(model):
+            agent = self.agents.contract_reviewer_agent(model)
+            return [agent], [LegalTasks.review_contract_task(agent, content, contract_type, summary)]
 
-        result = crew.kickoff()
-        return str(result)
+        return self._run_routed("contract_review", content, build)
 
     def extract_clauses(self, contract_content: str) -> str:
         """Extract and categorize contract clauses"""
-        agent = self.agents.contract_reviewer_agent()
-        task = LegalTasks.extract_clauses_task(agent, contract_content)
+        content, summary = self._prescreen(contract_content)
 
-        crew = Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
-        )
+        def build(model):
+            agent = self.agents.contract_reviewer_agent(model)
+            return [agent], [LegalTasks.extract_clauses_task(agent, content, summary)]
 
-        result = crew.kickoff()
-        return str(result)
+        return self._run_routed("clause_extraction", content, build)
+
+    def extract_key_terms(self, contract_content: str, prescreen: Optional[Dict[str, Any]] = None) -> str:
+        """Answer key-term extraction from the pattern pre-screen alone, without an LLM call"""
+        if prescreen is not None:
+            # Stored with the document at upload, so the text is not needed
+            return ContractPrescreener.format_summary(prescreen)
+        with span("document.prescreen", **{"document.chars": len(contract_content)}):
+            return ContractPrescreener.format_summary(ContractPrescreener.prescreen(contract_content))
 
     def conduct_research(self, query: str, jurisdiction: str = "General") -> str:
         """Conduct legal research"""
-        agent = self.agents.legal_researcher_agent()
-        task = LegalTasks.legal_research_task(agent, query, jurisdiction)
-
-        crew = Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
-        )
+        def build(model):
+            agent = self.agents.legal_researcher_agent(model)
+            return [agent], [LegalTasks.legal_research_task(agent, query, jurisdiction)]
 
-        result = crew.kickoff()
-        return str(result)
+        return self._run_routed("legal_research", query, build)
 
-    def assess_compliance(self, business_context: str, industry: str) -> str:
+    def assess_compliance(
+        self,
+        business_context: str,
+        industry: str,
+        jurisdiction: Optional[str] = None,
+        regulation: Optional[str] = None
+    ) -> str:
         """Assess compliance requirements"""
-        agent = self.agents.compliance_advisor_agent()
-        task = LegalTasks.compliance_assessment_task(agent, business_context, industry)
+        def build(model):
+            agent = self.agents.compliance_advisor_agent(model)
+            return [agent], [
+                LegalTasks.compliance_assessment_task(agent, business_context, industry, jurisdiction, regulation)
+            ]
+
+        return self._run_routed("compliance_assessment", business_context, build)
+
+    def assess_compliance_matrix(
+        self,
+        business_context: str,
+        industry: str,
+        jurisdictions: List[str],
+        regulations: List[str]
+    ) -> Dict[str, Any]:
+        """Assess every (jurisdiction, regulation) pair as a concurrent sub-task and merge the results"""
+        context_hash = hashlib.sha256(business_context.encode("utf-8")).hexdigest()
 
-        crew = Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
-        )
+        def cache_key(jurisdiction: str, regulation: Optional[str]) -> str:
+            return f"{industry.lower()}|{jurisdiction.lower()}|{(regulation or '*').lower()}|{context_hash}"
 
-        result = crew.kickoff()
-        return str(result)
+        # Repeated or differently-cased entries ("EU", "eu") would each cost a
+        # model call; keep the first spelling of each cell
+        cells = []
+        seen = set()
+        for jurisdiction in jurisdictions:
+            for regulation in regulations or [None]:
+                if cache_key(jurisdiction, regulation) not in seen:
+                    seen.add(cache_key(jurisdiction, regulation))
+                    cells.append((jurisdiction, regulation))
+
+        results = {}
+        missing = []
+        for cell in cells:
+            cached = self.compliance_cache.get(cache_key(*cell))
+            if cached is None:
+                missing.append(cell)
+            else:
+                results[cell] = {"assessment": cached, "cached": True}
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(len(missing), config.COMPLIANCE_MAX_PARALLEL)) as executor:
+                # Each sub-task runs in a copy of the caller's context so its
+                # spans stay attached to the request trace.
+                futures = {
+                    cell: executor.submit(
+                        contextvars.copy_context().run,
+                        self.assess_compliance,
+                        business_context,
+                        industry,
+                        *cell
+                    )
+                    for cell in missing
+                }
+                for cell, future in futures.items():
+                    try:
+                        assessment = future.result()
+                    except Exception as e:
+                        results[cell] = {"assessment": None, "cached": False, "error": str(e)}
+                        continue
+                    self.compliance_cache.set(cache_key(*cell), assessment)
+                    results[cell] = {"assessment": assessment, "cached": False}
+
+        matrix: Dict[str, Dict[str, Any]] = {}
+        for jurisdiction, regulation in cells:
+            matrix.setdefault(jurisdiction, {})[regulation or "all"] = results[(jurisdiction, regulation)]
+
+        return {
+            "matrix": matrix,
+            "sub_tasks": len(cells),
+            "cached": len(cells) - len(missing)
+        }
 
     def assess_risk(self, scenario: str, risk_type: str) -> str:
         """Assess legal risks"""
-        agent = self.agents.risk_assessment_agent()
-        task = LegalTasks.risk_assessment_task(agent, scenario, risk_type)
+        def build(model):
+            agent = self.agents.risk_assessment_agent(model)
+            return [agent], [LegalTasks.risk_assessment_task(agent, scenario, risk_type)]
 
-        crew = Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
-        )
-
-        result = crew.kickoff()
-        return str(result)
+        return self._run_routed("risk_assessment", scenario, build)
 
     def general_consultation(self, question: str, context: str = "") -> str:
         """Provide general legal consultation"""
-        agent = self.agents.legal_consultant_agent()
-        task = LegalTasks.general_consultation_task(agent, question, context)
+        def build(model):
+            agent = self.agents.legal_consultant_agent(model)
+            return [agent], [LegalTasks.general_consultation_task(agent, question, context)]
 
-        crew = Crew(
-            agents=[agent],
-            tasks=[task],
-            process=Process.sequential,
-            verbose=True
-        )
+        return self._run_routed("general_consultation", f"{question}\n{context}".strip(), build)
 
-        result = crew.kickoff()
-        return str(result)
+    def run_analysis(
+        self,
+        analysis_type: str,
+        document_content: str,
+        document_type: str,
+        prescreen: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Run the analysis matching an analysis type against a document"""
+        if analysis_type == "contract_review":
+            return self.review_contract(document_content, document_type or "contract")
+        if analysis_type == "clause_extraction":
+            return self.extract_clauses(document_content)
+        if analysis_type == "key_terms":
+            return self.extract_key_terms(document_content, prescreen)
+        return self.analyze_document(document_content, document_type or "document")
 
     def comprehensive_contract_analysis(self, contract_content: str, contract_type: str) -> str:
         """Perform comprehensive contract analysis using multiple agents"""
-        reviewer_agent = self.agents.contract_reviewer_agent()
-        risk_agent = self.agents.risk_assessment_agent()
-
-        review_task = LegalTasks.review_contract_task(reviewer_agent, contract_content, contract_type)
-        risk_task = LegalTasks.risk_assessment_task(
-            risk_agent,
-            f"Contract review for {contract_type}",
-            "Contractual Risk"
-        )
-
-        crew = Crew(
-            agents=[reviewer_agent, risk_agent],
-            tasks=[review_task, risk_task],
-            process=Process.sequential,
-            verbose=True
-        )
-
-        result = crew.kickoff()
-        return str(result)
+        def build(model):
+            reviewer_agent = self.agents.contract_reviewer_agent(model)
+            risk_agent = self.agents.risk_assessment_agent(model)
+
+            review_task = LegalTasks.review_contract_task(reviewer_agent, contract_content, contract_type)
+            risk_task = LegalTasks.risk_assessment_task(
+                risk_agent,
+                f"Contract review for {contract_type}",
+                "Contractual Risk"
+            )
+            return [reviewer_agent, risk_agent], [review_task, risk_task]
+
+        return self._run_routed("comprehensive_contract_analysis", contract_content, build)
@@ -0,0 +1,142 @@
+import logging
+import re
+import threading
+from typing import Dict, Any, Optional
+
+from config import config
+
+logger = logging.getLogger("legal_ai.routing")
+
+# Signals that a request needs multi-step legal reasoning rather than a lookup
+COMPLEXITY_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [
+        r"\bindemnif",
+        r"\blimitation of liability\b|\bliabilit",
+        r"\bjurisdictions?\b|\bcross-border\b",
+        r"\barbitration\b|\blitigation\b",
+        r"\bprecedent|\bcase law\b",
+        r"\bconflict(s)? of law",
+        r"\bregulat",
+        r"\bcompare\b|\btrade-?offs?\b",
+        r"\bstrategy\b|\bnegotiat",
+        r"\bwhat if\b|\bscenario"
+    ]
+]
+
+# Outputs that indicate the model gave up or hit crewai's iteration limit
+FAILURE_MARKERS = [
+    "agent stopped due to iteration limit",
+    "i cannot help",
+    "i'm unable to",
+    "i am unable to"
+]
+
+# Markers only count at the start of an answer or in a short one; a full
+# answer that ends with the "I am unable to provide legal advice" disclaimer
+# the consultant agent is told to give is not a failure.
+FAILURE_MARKER_WINDOW = 120
+FAILURE_SHORT_OUTPUT_CHARS = 500
+
+
+class ModelRouter:
+    """Pick a small or large model per request and track what routing saves"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def complexity_score(content: str) -> int:
+        """Cheap complexity estimate from legal reasoning signals and question count"""
+        score = sum(1 for pattern in COMPLEXITY_PATTERNS if pattern.search(content))
+        score += max(content.count("?") - 1, 0)
+        return score
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        return max(len(text) // 4, 1)
+
+    def route(self, task_type: str, content: str) -> Dict[str, Any]:
+        """Decide which model tier should serve a request"""
+        if not config.ROUTING_ENABLED:
+            return {"task_type": task_type, "tier": "large", "reason": "routing disabled"}
+        if task_type not in config.ROUTING_SMALL_TASKS:
+            return {"task_type": task_type, "tier": "large", "reason": "task type"}
+        if len(content) > config.ROUTING_SMALL_MAX_CHARS:
+            return {"task_type": task_type, "tier": "large", "reason": "input size"}
+
+        score = self.complexity_score(content)
+        if score >= config.ROUTING_COMPLEXITY_THRESHOLD:
+            return {"task_type": task_type, "tier": "large", "reason": f"complexity {score}"}
+        return {"task_type": task_type, "tier": "small", "reason": f"complexity {score}"}
+
+    @staticmethod
+    def validate(output: str) -> bool:
+        """Whether a small-model answer is usable or should be escalated"""
+        text = output.strip()
+        if len(text) < config.ROUTING_MIN_OUTPUT_CHARS:
+            return False
+        lowered = text.lower()
+        if len(lowered) > FAILURE_SHORT_OUTPUT_CHARS:
+            lowered = lowered[:FAILURE_MARKER_WINDOW]
+        return not any(marker in lowered for marker in FAILURE_MARKERS)
+
+    def record(
+        self,
+        decision: Dict[str, Any],
+        tier: str,
+        content: str,
+        output: str,
+        latency_ms: float,
+        tokens: Optional[int] = None,
+        failed: bool = False
+    ) -> None:
+        """Log one model run with its cost and estimated latency savings
+
+        tokens is the total crewai reports for the run (prompts, backstory and
+        every agent iteration); the content and output sizes are only used
+        when it is missing, e.g. for a run that raised. A failed small-model
+        attempt is logged on its own as pure waste and kept out of the latency
+        averages; the large run it escalates to is then recorded with only its
+        own latency.
+        """
+        estimated = tokens is None
+        if estimated:
+            tokens = self.estimate_tokens(content) + self.estimate_tokens(output)
+        costs = config.MODEL_COST_PER_MILLION_TOKENS
+        cost = tokens * costs[tier] / 1_000_000
+
+        key = f"{decision['task_type']}:{tier}"
+        with self._lock:
+            if not failed:
+                stats = self._stats.setdefault(key, {"count": 0, "latency_ms": 0.0})
+                stats["count"] += 1
+                stats["latency_ms"] += latency_ms
+            large = self._stats.get(f"{decision['task_type']}:large")
+            large_latency = large["latency_ms"] / large["count"] if large else None
+
+        if failed:
+            cost_saved, latency_saved = -cost, -latency_ms
+        elif tier == "small":
+            cost_saved = tokens * costs["large"] / 1_000_000 - cost
+            latency_saved = large_latency - latency_ms if large_latency is not None else 0.0
+        else:
+            cost_saved, latency_saved = 0.0, 0.0
+
+        logger.info(
+            "route task=%s tier=%s reason=%s failed=%s failure=%s escalated=%s latency_ms=%.0f tokens=%d "
+            "tokens_estimated=%s cost_usd=%.6f cost_saved_usd=%.6f latency_saved_ms=%.0f",
+            decision["task_type"],
+            tier,
+            decision["reason"],
+            failed,
+            decision.get("escalation_reason"),
+            decision.get("escalated", False),
+            latency_ms,
+            tokens,
+            estimated,
+            cost,
+            cost_saved,
+            latency_saved
+        )
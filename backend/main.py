@@ -1,14 +1,24 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+import asyncio
+import logging
+import uuid
 import uvicorn
+from contextlib import contextmanager
 from datetime import datetime
 from supabase import create_client, Client
 
 from config import config
-from crews import LegalCrew
-from tools import DocumentProcessor
+from crews import LegalCrew, AnalysisPrefetcher, usage_meter
+from tools import DocumentProcessor, ContractPrescreener
+from tracing import setup_tracing, span, traced_execute
+from write_behind import WriteBehindQueue
+from shared_cache import SharedCache
+
+logging.basicConfig(level=logging.INFO)
+setup_tracing()
 
 app = FastAPI(title="Legal AI Assistant API", version="1.0.0")
 
@@ -23,6 +33,86 @@ app.add_middleware(
 supabase: Client = create_client(config.SUPABASE_URL, config.SUPABASE_SERVICE_KEY)
 legal_crew = LegalCrew()
 
+write_behind = WriteBehindQueue(
+    supabase,
+    max_batch=config.WRITE_BEHIND_MAX_BATCH,
+    flush_interval_ms=config.WRITE_BEHIND_FLUSH_MS,
+    max_retries=config.WRITE_BEHIND_MAX_RETRIES,
+    spill_path=config.WRITE_BEHIND_SPILL_FILE
+)
+
+in_flight_requests = 0
+
+prefetcher = AnalysisPrefetcher(
+    legal_crew,
+    analysis_types=config.PREFETCH_ANALYSES,
+    max_workers=config.PREFETCH_MAX_WORKERS,
+    max_load=config.PREFETCH_MAX_LOAD,
+    current_load=lambda: in_flight_requests,
+    cache_size=config.PREFETCH_CACHE_SIZE,
+    shared_cache=SharedCache(config.SHARED_CACHE_PATH, "analysis", config.PREFETCH_CACHE_SIZE)
+) if config.PREFETCH_ENABLED else None
+
+@contextmanager
+def track_usage(user_id: str, operation_type: str):
+    """Queue a usage_analytics row per model for the crew runs made inside the block"""
+    runs: List[Dict[str, Any]] = []
+    token = usage_meter.set(runs)
+    try:
+        yield
+    finally:
+        # Failed requests are billed too; their model calls still ran
+        usage_meter.reset(token)
+        totals: Dict[str, Dict[str, Any]] = {}
+        for run in runs:
+            total = totals.setdefault(run["model_used"], {"tokens_used": 0, "cost": 0.0})
+            total["tokens_used"] += run["tokens_used"]
+            total["cost"] += run["cost"]
+        for model_used, total in totals.items():
+            write_behind.enqueue("usage_analytics", {
+                "user_id": user_id,
+                "tokens_used": total["tokens_used"],
+                "cost": round(total["cost"], 6),
+                "model_used": model_used,
+                "operation_type": operation_type,
+                "created_at": datetime.utcnow().isoformat()
+            })
+
+@app.middleware("http")
+async def track_in_flight_requests(request, call_next):
+    """Count foreground requests so speculative work can back off under load
+
+    Crew calls run in threads, so requests queued behind a running agent are
+    counted too.
+    """
+    global in_flight_requests
+    in_flight_requests += 1
+    try:
+        return await call_next(request)
+    finally:
+        in_flight_requests -= 1
+
+@app.middleware("http")
+async def trace_requests(request, call_next):
+    """Open a root span for each API request"""
+    with span(
+        f"{request.method} {request.url.path}",
+        **{"http.method": request.method, "http.target": request.url.path}
+    ) as current:
+        response = await call_next(request)
+        current.set_attribute("http.status_code", response.status_code)
+        return response
+
+@app.on_event("startup")
+def start_write_behind():
+    write_behind.start()
+
+@app.on_event("shutdown")
+def shutdown_background_work():
+    if prefetcher:
+        prefetcher.shutdown()
+    write_behind.stop()
+
 class ChatRequest(BaseModel):
     user_id: str
     conversation_id: Optional[str] = None
@@ -46,6 +136,13 @@ class ComplianceRequest(BaseModel):
     business_context: str
     industry: str
 
+class ComplianceMatrixRequest(BaseModel):
+    user_id: str
+    business_context: str
+    industry: str
+    jurisdictions: List[str] = Field(..., min_length=1)
+    regulations: List[str] = []
+
 class RiskAssessmentRequest(BaseModel):
     user_id: str
     scenario: str
@@ -56,7 +153,8 @@ async def root():
     return {
         "message": "Legal AI Assistant API",
         "version": "1.0.0",
-        "model": config.MODEL_NAME
+        "model": config.MODEL_NAME,
+        "small_model": config.SMALL_MODEL_NAME if config.ROUTING_ENABLED else None
     }
 
 @app.post("/api/chat")
@@ -66,14 +164,15 @@ async def chat(request: ChatRequest):
         conversation_id = request.conversation_id
 
         if not conversation_id:
+            conversation_id = str(uuid.uuid4())
             conversation_data = {
+                "id": conversation_id,
                 "user_id": request.user_id,
                 "title": request.message[:100],
                 "conversation_type": request.conversation_type,
                 "created_at": datetime.utcnow().isoformat()
             }
-            result = supabase.table("conversations").insert(conversation_data).execute()
-            conversation_id = result.data[0]["id"]
+            write_behind.enqueue("conversations", conversation_data)
 
         user_message_data = {
             "conversation_id": conversation_id,
@@ -81,9 +180,10 @@ async def chat(request: ChatRequest):
             "content": request.message,
             "created_at": datetime.utcnow().isoformat()
         }
-        supabase.table("messages").insert(user_message_data).execute()
+        write_behind.enqueue("messages", user_message_data)
 
-        response = legal_crew.general_consultation(request.message, request.context or "")
+        with track_usage(request.user_id, "chat"):
+            response = await asyncio.to_thread(legal_crew.general_consultation, request.message, request.context or "")
 
         assistant_message_data = {
             "conversation_id": conversation_id,
@@ -91,7 +191,7 @@ async def chat(request: ChatRequest):
             "content": response,
             "created_at": datetime.utcnow().isoformat()
         }
-        supabase.table("messages").insert(assistant_message_data).execute()
+        write_behind.enqueue("messages", assistant_message_data)
 
         return {
             "conversation_id": conversation_id,
@@ -113,7 +213,10 @@ async def upload_document(
         file_bytes = await file.read()
         file_type = file.content_type
 
-        processed = DocumentProcessor.process_document(file_bytes, file_type)
+        # OCR of scanned pages can take a while; keep it off the event loop
+        processed = await asyncio.to_thread(DocumentProcessor.process_document, file_bytes, file_type)
+        content_hash = AnalysisPrefetcher.content_hash(processed["text"])
+        prescreen = ContractPrescreener.metadata(ContractPrescreener.prescreen(processed["text"]))
 
         document_data = {
             "user_id": user_id,
@@ -125,19 +228,25 @@ async def upload_document(
             "processed": True,
             "metadata": {
                 "word_count": processed["word_count"],
-                "char_count": processed["char_count"]
+                "char_count": processed["char_count"],
+                "content_hash": content_hash,
+                "prescreen": prescreen,
+                **processed["extraction"]
             },
             "created_at": datetime.utcnow().isoformat()
         }
 
-        result = supabase.table("documents").insert(document_data).execute()
+        result = traced_execute(supabase.table("documents").insert(document_data), "documents", "insert")
         document_id = result.data[0]["id"]
 
+        prefetched = prefetcher.prefetch(content_hash, processed["text"], file_type) if prefetcher else []
+
         return {
             "document_id": document_id,
             "file_name": file.filename,
             "text": processed["text"],
-            "metadata": document_data["metadata"]
+            "metadata": document_data["metadata"],
+            "prefetched_analyses": prefetched
         }
 
     except Exception as e:
@@ -147,7 +256,7 @@ async def upload_document(
 async def analyze_document(request: DocumentAnalysisRequest):
     """Analyze a document using AI agents"""
     try:
-        doc_result = supabase.table("documents").select("*").eq("id", request.document_id).execute()
+        doc_result = traced_execute(supabase.table("documents").select("*").eq("id", request.document_id), "documents", "select")
 
         if not doc_result.data:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -155,24 +264,27 @@ async def analyze_document(request: DocumentAnalysisRequest):
         document = doc_result.data[0]
 
         analysis_type = request.analysis_type
-
-        if analysis_type == "contract_review":
-            response = legal_crew.review_contract(
-                document.get("text", ""),
-                document.get("file_type", "contract")
-            )
-        elif analysis_type == "clause_extraction":
-            response = legal_crew.extract_clauses(document.get("text", ""))
-        elif analysis_type == "document_analysis":
-            response = legal_crew.analyze_document(
-                document.get("text", ""),
-                document.get("file_type", "document")
-            )
-        else:
-            response = legal_crew.analyze_document(
-                document.get("text", ""),
-                document.get("file_type", "document")
-            )
+        metadata = document.get("metadata") or {}
+        content_hash = metadata.get("content_hash")
+
+        response = None
+        run = prefetcher.get(content_hash, analysis_type) if prefetcher and content_hash else None
+        if run:
+            try:
+                response = await asyncio.wrap_future(run)
+            except Exception:
+                response = None
+        prefetched = bool(response)
+
+        if not response:
+            with track_usage(request.user_id, "document_analysis"):
+                response = await asyncio.to_thread(
+                    legal_crew.run_analysis,
+                    analysis_type,
+                    document.get("text", ""),
+                    document.get("file_type", ""),
+                    metadata.get("prescreen")
+                )
 
         analysis_data = {
             "document_id": request.document_id,
@@ -181,12 +293,13 @@ async def analyze_document(request: DocumentAnalysisRequest):
             "created_at": datetime.utcnow().isoformat()
         }
 
-        supabase.table("document_analysis").insert(analysis_data).execute()
+        write_behind.enqueue("document_analysis", analysis_data)
 
         return {
             "document_id": request.document_id,
             "analysis_type": analysis_type,
             "analysis": response,
+            "prefetched": prefetched,
             "timestamp": datetime.utcnow().isoformat()
         }
 
@@ -197,9 +310,11 @@ async def analyze_document(request: DocumentAnalysisRequest):
 async def legal_research(request: ResearchRequest):
     """Conduct legal research"""
     try:
-        response = legal_crew.conduct_research(request.query, request.jurisdiction)
+        with track_usage(request.user_id, "legal_research"):
+            response = await asyncio.to_thread(legal_crew.conduct_research, request.query, request.jurisdiction)
 
         research_data = {
+            "id": str(uuid.uuid4()),
             "user_id": request.user_id,
             "conversation_id": request.conversation_id,
             "query": request.query,
@@ -209,10 +324,10 @@ async def legal_research(request: ResearchRequest):
             "created_at": datetime.utcnow().isoformat()
         }
 
-        result = supabase.table("legal_research").insert(research_data).execute()
+        write_behind.enqueue("legal_research", research_data)
 
         return {
-            "research_id": result.data[0]["id"],
+            "research_id": research_data["id"],
             "query": request.query,
             "jurisdiction": request.jurisdiction,
             "research": response,
@@ -226,7 +341,8 @@ async def legal_research(request: ResearchRequest):
 async def compliance_assessment(request: ComplianceRequest):
     """Assess compliance requirements"""
     try:
-        response = legal_crew.assess_compliance(request.business_context, request.industry)
+        with track_usage(request.user_id, "compliance_assessment"):
+            response = await asyncio.to_thread(legal_crew.assess_compliance, request.business_context, request.industry)
 
         return {
             "business_context": request.business_context,
@@ -238,11 +354,42 @@ async def compliance_assessment(request: ComplianceRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/compliance-matrix")
+async def compliance_matrix(request: ComplianceMatrixRequest):
+    """Assess compliance across several jurisdictions and regulation families in parallel"""
+    cells = len(request.jurisdictions) * max(len(request.regulations), 1)
+    if cells > config.COMPLIANCE_MAX_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many jurisdiction/regulation combinations ({cells}, max {config.COMPLIANCE_MAX_CELLS})"
+        )
+
+    try:
+        with track_usage(request.user_id, "compliance_matrix"):
+            result = await asyncio.to_thread(
+                legal_crew.assess_compliance_matrix,
+                request.business_context,
+                request.industry,
+                request.jurisdictions,
+                request.regulations
+            )
+
+        return {
+            "business_context": request.business_context,
+            "industry": request.industry,
+            **result,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/risk-assessment")
 async def risk_assessment(request: RiskAssessmentRequest):
     """Assess legal risks"""
     try:
-        response = legal_crew.assess_risk(request.scenario, request.risk_type)
+        with track_usage(request.user_id, "risk_assessment"):
+            response = await asyncio.to_thread(legal_crew.assess_risk, request.scenario, request.risk_type)
 
         task_data = {
             "user_id": request.user_id,
@@ -257,7 +404,7 @@ async def risk_assessment(request: RiskAssessmentRequest):
             "created_at": datetime.utcnow().isoformat()
         }
 
-        supabase.table("agent_tasks").insert(task_data).execute()
+        write_behind.enqueue("agent_tasks", task_data)
 
         return {
             "scenario": request.scenario,
@@ -273,7 +420,7 @@ async def risk_assessment(request: RiskAssessmentRequest):
 async def get_conversations(user_id: str):
     """Get all conversations for a user"""
     try:
-        result = supabase.table("conversations").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+        result = traced_execute(supabase.table("conversations").select("*").eq("user_id", user_id).order("created_at", desc=True), "conversations", "select")
 
         return {
             "conversations": result.data
@@ -286,7 +433,7 @@ async def get_conversations(user_id: str):
 async def get_messages(conversation_id: str):
     """Get all messages in a conversation"""
     try:
-        result = supabase.table("messages").select("*").eq("conversation_id", conversation_id).order("created_at").execute()
+        result = traced_execute(supabase.table("messages").select("*").eq("conversation_id", conversation_id).order("created_at"), "messages", "select")
 
         return {
             "messages": result.data
@@ -299,7 +446,7 @@ async def get_messages(conversation_id: str):
 async def get_documents(user_id: str):
     """Get all documents for a user"""
     try:
-        result = supabase.table("documents").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+        result = traced_execute(supabase.table("documents").select("*").eq("user_id", user_id).order("created_at", desc=True), "documents", "select")
 
         return {
             "documents": result.data
@@ -308,5 +455,29 @@ async def get_documents(user_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/stats/{user_id}")
+async def get_stats(user_id: str):
+    """Get precomputed dashboard aggregates for a user"""
+    try:
+        result = traced_execute(supabase.table("user_dashboard_stats").select("*").eq("user_id", user_id).limit(1), "user_dashboard_stats", "select")
+
+        stats = result.data[0] if result.data else {
+            "user_id": user_id,
+            "total_conversations": 0,
+            "conversations_by_type": {},
+            "documents_uploaded": 0,
+            "documents_processed": 0,
+            "total_analyses": 0,
+            "analyses_by_type": {},
+            "tokens_used": 0
+        }
+
+        return {
+            "stats": stats
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
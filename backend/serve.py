@@ -0,0 +1,48 @@
+"""Production launcher: runs the API in several pre-forked worker processes.
+
+The app (crewai, litellm, supabase and friends) is imported once in the
+gunicorn master before forking so workers share those pages copy-on-write.
+On SIGTERM gunicorn stops accepting connections and gives in-flight requests
+up to GRACEFUL_TIMEOUT seconds to finish; each worker's shutdown hook then
+flushes the write-behind queue.
+"""
+
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from config import config
+
+
+class LegalAIServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        self.application = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        if self.application is None:
+            from main import app
+            self.application = app
+        return self.application
+
+
+if __name__ == "__main__":
+    # Every worker gets its own OCR process pool; unless sized explicitly,
+    # split the cores between workers instead of giving each one all of them.
+    if "OCR_MAX_WORKERS" not in os.environ:
+        config.OCR_MAX_WORKERS = max((os.cpu_count() or 1) // config.WORKERS, 1)
+
+    LegalAIServer({
+        "bind": f"{config.SERVER_HOST}:{config.SERVER_PORT}",
+        "workers": config.WORKERS,
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": True,
+        "timeout": config.WORKER_TIMEOUT,
+        "graceful_timeout": config.GRACEFUL_TIMEOUT,
+        "keepalive": 5
+    }).run()
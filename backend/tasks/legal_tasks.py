@@ -1,5 +1,5 @@
 from crewai import Task
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class LegalTasks:
     @staticmethod
@@ -26,13 +26,15 @@ Format your response in a structured, easy-to-read manner.""",
         )
 
     @staticmethod
-    def review_contract_task(agent, contract_content: str, contract_type: str) -> Task:
+    def review_contract_task(agent, contract_content: str, contract_type: str, prescreen_summary: str = "") -> Task:
         """Task for contract review and risk assessment"""
+        prescreen = f"\n\nAutomated Pre-Screen (pattern-based; verify against the contract text):\n{prescreen_summary}" if prescreen_summary else ""
+
         return Task(
             description=f"""Review the following {contract_type} contract and provide a detailed assessment:
 
 Contract Content:
-{contract_content}
+{contract_content}{prescreen}
 
 Your review should include:
 1. Contract Type & Purpose: Identify the contract type and its purpose
@@ -56,13 +58,15 @@ Rate the overall contract risk as: LOW, MEDIUM, or HIGH.""",
         )
 
     @staticmethod
-    def extract_clauses_task(agent, contract_content: str) -> Task:
+    def extract_clauses_task(agent, contract_content: str, prescreen_summary: str = "") -> Task:
         """Task for extracting and categorizing contract clauses"""
+        prescreen = f"\n\nAutomated Pre-Screen (pattern-based; verify against the contract text):\n{prescreen_summary}" if prescreen_summary else ""
+
         return Task(
             description=f"""Extract and categorize all important clauses from the following contract:
 
 Contract Content:
-{contract_content}
+{contract_content}{prescreen}
 
 Identify and extract the following clause types:
 1. Payment & Financial Clauses
@@ -111,13 +115,27 @@ specific legal matters.""",
         )
 
     @staticmethod
-    def compliance_assessment_task(agent, business_context: str, industry: str) -> Task:
-        """Task for assessing compliance requirements"""
+    def compliance_assessment_task(
+        agent,
+        business_context: str,
+        industry: str,
+        jurisdiction: Optional[str] = None,
+        regulation: Optional[str] = None
+    ) -> Task:
+        """Task for assessing compliance requirements, optionally scoped to one jurisdiction and regulation family"""
+        scope = f"\nJurisdiction: {jurisdiction}" if jurisdiction else ""
+        scope += f"\nRegulation Family: {regulation}" if regulation else ""
+        focus = (
+            f"\n\nLimit your assessment to {regulation or 'the regulations'} that apply in {jurisdiction or 'the relevant jurisdictions'}. "
+            "Skip sections that do not apply to this scope."
+            if scope else ""
+        )
+
         return Task(
             description=f"""Assess compliance requirements for the following business context:
 
 Business Context: {business_context}
-Industry: {industry}
+Industry: {industry}{scope}{focus}
 
 Your compliance assessment should cover:
 1. Regulatory Framework: Identify applicable regulations and standards
@@ -1,3 +1,4 @@
 from .document_processor import DocumentProcessor
+from .contract_prescreener import ContractPrescreener
 
-__all__ = ['DocumentProcessor']
+__all__ = ['DocumentProcessor', 'ContractPrescreener']
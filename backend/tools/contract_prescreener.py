@@ -0,0 +1,198 @@
+import re
+import time
+from typing import Dict, Any, List
+
+# One alternation per clause category, combined into a single pattern so a
+# document is scanned once; the matching group name is the category. Risk
+# flags come first so their more specific phrases win over generic terms.
+CLAUSE_LEXICON = {
+    "auto_renewal": r"\bautomatically\s+renew\w*|\bauto-?renew\w*|\brenew\w*\s+automatically\b|\bevergreen\b"
+                    r"|\bsuccessive\s+(?:\w+\s+){0,2}(?:renewal\s+)?(?:terms|periods)\b",
+    "unlimited_liability": r"\bunlimited liability\b|\buncapped\b|\bliability\s+(?:\w+\s+){0,3}shall not be limited\b"
+                           r"|\bwithout (?:any )?limit(?:ation)? (?:as to|on|of) (?:the )?(?:amount|liability)\b",
+    "non_compete": r"\bnon-?compet\w*|\bnot\s+(?:directly\s+or\s+indirectly\s+)?compete\b|\bnon-?solicit\w*",
+    "payment": r"\bpayments?\b|\binvoic\w*|\bfees?\b|\bcompensation\b|\bpurchase price\b",
+    "term_termination": r"\bterminat\w*|\bterm of this agreement\b|\bexpir\w*",
+    "liability_indemnification": r"\bindemni\w*|\bliabilit\w*|\bhold harmless\b",
+    "confidentiality": r"\bconfidential\w*|\bnon-disclosure\b|\bproprietary information\b",
+    "intellectual_property": r"\bintellectual property\b|\bcopyrights?\b|\bpatents?\b|\btrademarks?\b|\bwork product\b",
+    "dispute_resolution": r"\barbitrat\w*|\bmediat\w*|\bdisputes?\b|\bexclusive jurisdiction\b|\bvenue\b",
+    "warranty": r"\bwarrant\w*|\brepresentations?\b",
+    "force_majeure": r"\bforce majeure\b|\bacts? of god\b",
+    "governing_law": r"\bgoverning law\b|\bgoverned by\b"
+}
+
+RISK_FLAGS = ["auto_renewal", "unlimited_liability", "non_compete"]
+
+# A risk-flag match consumes the text its broader category would have matched
+IMPLIED_CATEGORIES = {
+    "auto_renewal": "term_termination",
+    "unlimited_liability": "liability_indemnification"
+}
+
+CLAUSE_PATTERN = re.compile(
+    "|".join(f"(?P<{category}>{pattern})" for category, pattern in CLAUSE_LEXICON.items()),
+    re.IGNORECASE
+)
+
+HEADING_PATTERN = re.compile(
+    r"^\s*(?:(?i:article|section|clause)\s+[\dIVXLC]+\b|\d+(?:\.\d+)*[.)]?\s+[A-Z]|[A-Z][A-Z &/,-]{3,}$)"
+)
+
+# Sections kept in the focused text whether or not they match a category:
+# the opening ones (title and preamble naming the parties and purpose), and
+# definitions and recitals, which the rest of the contract depends on.
+LEADING_SECTIONS = 2
+CONTEXT_SECTION_PATTERN = re.compile(
+    r"^\W*(?:(?:article|section|clause)\s+[\dIVXLC]+\W*|\d+(?:\.\d+)*[.)]?\s+)?"
+    r"(?:definitions|defined terms|interpretation|recitals|background|whereas)\b",
+    re.IGNORECASE
+)
+
+MONTHS = r"(?:January|February|March|April|May|June|July|August|September|October|November|December|" \
+         r"Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sept?|Oct|Nov|Dec)\.?"
+
+DATE_PATTERN = re.compile(
+    rf"\b{MONTHS}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}\b"
+    rf"|\b\d{{1,2}}(?:st|nd|rd|th)?\s+(?:day\s+of\s+)?{MONTHS},?\s+\d{{4}}\b"
+    r"|\b\d{4}-\d{2}-\d{2}\b"
+    r"|\b\d{1,2}/\d{1,2}/\d{2,4}\b"
+)
+
+PERIOD_PATTERN = re.compile(
+    r"\b(?:\d+|one|two|three|four|five|six|seven|eight|nine|ten|twelve|thirty|sixty|ninety)"
+    r"(?:\s*\(\d+\))?\s+(?:business\s+|calendar\s+)?(?:days?|weeks?|months?|years?)\b",
+    re.IGNORECASE
+)
+
+GOVERNING_LAW_PATTERN = re.compile(
+    r"governed by(?:,?\s+and\s+(?:construed|interpreted)\s+in\s+accordance\s+with,?)?\s+the\s+laws?\s+of\s+"
+    r"(?:the\s+)?(?:State\s+of\s+|Commonwealth\s+of\s+)?([A-Z][\w .'-]{1,60}?)(?=\s*(?:[,.;(]|\bwithout\b|\bexcluding\b|$))",
+    re.IGNORECASE
+)
+
+PARTIES_PATTERN = re.compile(
+    r"\bbetween\s*:?\s+(.{2,150}?)\s*(?:\([^)]*\))?,?\s+and\s+(.{2,150}?)\s*(?:\(|,|;|\.\s|\n|$)",
+    re.IGNORECASE | re.DOTALL
+)
+
+DEFINED_PARTY_PATTERN = re.compile(
+    r"\(\s*(?:hereinafter\s+)?(?:referred\s+to\s+as\s+)?(?:the\s+)?[\"“']([A-Z][\w -]{1,40})[\"”']\s*\)"
+)
+
+
+class ContractPrescreener:
+    """Deterministic rule and pattern pre-screen of contract text, run before any LLM call"""
+
+    @staticmethod
+    def split_sections(text: str) -> List[str]:
+        """Split contract text into sections on blank lines and numbered or capitalized headings"""
+        sections = []
+        current: List[str] = []
+        for line in text.splitlines():
+            if not line.strip() or (HEADING_PATTERN.match(line) and current):
+                if current:
+                    sections.append("\n".join(current).strip())
+                current = [line] if line.strip() else []
+            else:
+                current.append(line)
+        if current:
+            sections.append("\n".join(current).strip())
+        return [section for section in sections if section]
+
+    @staticmethod
+    def _unique(values: List[str], limit: int) -> List[str]:
+        seen = []
+        for value in values:
+            value = " ".join(value.split()).strip(" ,;:")
+            if value and value not in seen:
+                seen.append(value)
+            if len(seen) >= limit:
+                break
+        return seen
+
+    @staticmethod
+    def prescreen(text: str) -> Dict[str, Any]:
+        """Extract key terms, risk flags and the sections matching each clause category"""
+        started = time.perf_counter()
+        sections = ContractPrescreener.split_sections(text)
+
+        clauses: Dict[str, List[int]] = {}
+        for index, section in enumerate(sections):
+            for match in CLAUSE_PATTERN.finditer(section):
+                for category in (match.lastgroup, IMPLIED_CATEGORIES.get(match.lastgroup)):
+                    if category is None:
+                        continue
+                    matched = clauses.setdefault(category, [])
+                    if not matched or matched[-1] != index:
+                        matched.append(index)
+
+        parties = []
+        parties_match = PARTIES_PATTERN.search(text[:3000])
+        if parties_match:
+            parties.extend(parties_match.groups())
+        parties.extend(DEFINED_PARTY_PATTERN.findall(text[:5000]))
+
+        governing_law = GOVERNING_LAW_PATTERN.search(text)
+
+        return {
+            "parties": ContractPrescreener._unique(parties, 6),
+            "dates": ContractPrescreener._unique(DATE_PATTERN.findall(text), 20),
+            "periods": ContractPrescreener._unique(PERIOD_PATTERN.findall(text), 20),
+            "governing_law": governing_law.group(1).strip() if governing_law else None,
+            "flags": {
+                flag: [sections[index][:300] for index in clauses.get(flag, [])[:3]]
+                for flag in RISK_FLAGS
+            },
+            "clauses": clauses,
+            "sections": sections,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    @staticmethod
+    def focus(prescreen: Dict[str, Any]) -> str:
+        """Join the sections that matched a clause category, plus the opening, definitions and recitals, in document order"""
+        sections = prescreen["sections"]
+        flagged = {index for indices in prescreen["clauses"].values() for index in indices}
+        if not flagged:
+            return ""
+        flagged.update(range(min(LEADING_SECTIONS, len(sections))))
+        flagged.update(index for index, section in enumerate(sections) if CONTEXT_SECTION_PATTERN.match(section))
+        return "\n\n".join(sections[index] for index in sorted(flagged))
+
+    @staticmethod
+    def format_summary(prescreen: Dict[str, Any]) -> str:
+        """Render a full pre-screen, or its compact metadata form, as plain text for users and agent prompts"""
+        # The compact form stored with a document has category and flag names
+        # but no section indices or flagged snippets
+        categories = prescreen["clauses"] if "clauses" in prescreen else prescreen.get("clause_categories", [])
+        flags = prescreen.get("flags") or {flag: [] for flag in RISK_FLAGS}
+        raised = [flag for flag in RISK_FLAGS if flags[flag] or flag in prescreen.get("risk_flags", [])]
+        found = [category for category in CLAUSE_LEXICON if category in categories]
+        missing = [category for category in CLAUSE_LEXICON if category not in categories and category not in RISK_FLAGS]
+
+        lines = [
+            f"Parties: {', '.join(prescreen['parties']) or 'Not detected'}",
+            f"Governing Law: {prescreen['governing_law'] or 'Not detected'}",
+            f"Dates: {', '.join(prescreen['dates']) or 'None detected'}",
+            f"Time Periods: {', '.join(prescreen.get('periods', [])) or 'None detected'}",
+            f"Clause Categories Found: {', '.join(found) or 'None'}",
+            f"Clause Categories Not Found: {', '.join(missing) or 'None'}",
+            "Risk Flags:"
+        ]
+        for flag in RISK_FLAGS:
+            lines.append(f"- {flag}: {'YES' if flag in raised else 'no'}")
+            lines.extend(f"    \"{' '.join(snippet.split())}\"" for snippet in flags[flag])
+        return "\n".join(lines)
+
+    @staticmethod
+    def metadata(prescreen: Dict[str, Any]) -> Dict[str, Any]:
+        """Compact, JSON-serializable form of the pre-screen for document metadata"""
+        return {
+            "parties": prescreen["parties"],
+            "dates": prescreen["dates"],
+            "periods": prescreen["periods"],
+            "governing_law": prescreen["governing_law"],
+            "risk_flags": [flag for flag in RISK_FLAGS if prescreen["flags"][flag]],
+            "clause_categories": sorted(prescreen["clauses"])
+        }
@@ -1,26 +1,125 @@
 import PyPDF2
 import docx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import io
+import hashlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import config
+from tracing import span
+from shared_cache import SharedCache
+
+try:
+    import pytesseract
+    from pdf2image import convert_from_bytes
+except ImportError:
+    pytesseract = None
+    convert_from_bytes = None
+
+
+def _ocr_page(page_pdf: bytes, dpi: int, language: str) -> str:
+    """Rasterize a single-page PDF and run it through Tesseract (runs in a worker process)"""
+    images = convert_from_bytes(page_pdf, dpi=dpi)
+    return "\n".join(pytesseract.image_to_string(image, lang=language) for image in images).strip()
+
+
+_ocr_cache = SharedCache(config.SHARED_CACHE_PATH, "ocr", config.OCR_CACHE_SIZE)
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+_ocr_pool_lock = threading.Lock()
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(max_workers=config.OCR_MAX_WORKERS)
+        return _ocr_pool
+
 
 class DocumentProcessor:
     """Process and extract text from various document formats"""
 
     @staticmethod
-    def extract_text_from_pdf(file_bytes: bytes) -> str:
-        """Extract text from PDF file"""
+    def ocr_available() -> bool:
+        """Whether the local OCR engine is installed and enabled"""
+        return config.OCR_ENABLED and pytesseract is not None and convert_from_bytes is not None
+
+    @staticmethod
+    def _isolate_page(page) -> bytes:
+        """Serialize a single PDF page so it can be hashed and shipped to an OCR worker"""
+        writer = PyPDF2.PdfWriter()
+        writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    @staticmethod
+    def extract_pdf(file_bytes: bytes) -> Dict[str, Any]:
+        """Extract text from PDF file, OCRing only the pages that have no text layer"""
         try:
+            started = time.perf_counter()
             pdf_file = io.BytesIO(file_bytes)
             pdf_reader = PyPDF2.PdfReader(pdf_file)
 
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
+            page_texts = []
+            scanned_pages = []
+            for index, page in enumerate(pdf_reader.pages):
+                page_text = page.extract_text() or ""
+                page_texts.append(page_text)
+                if len(page_text.strip()) < config.OCR_MIN_PAGE_CHARS:
+                    scanned_pages.append(index)
 
-            return text.strip()
+            stats = {
+                "page_count": len(page_texts),
+                "scanned_pages": len(scanned_pages),
+                "ocr_pages": 0,
+                "ocr_cached_pages": 0,
+                "ocr_failed_pages": 0,
+                "ocr_time_ms": 0
+            }
+
+            if scanned_pages and DocumentProcessor.ocr_available():
+                ocr_started = time.perf_counter()
+                pending = {}
+                for index in scanned_pages:
+                    page_pdf = DocumentProcessor._isolate_page(pdf_reader.pages[index])
+                    page_hash = hashlib.sha256(page_pdf).hexdigest()
+                    cached = _ocr_cache.get(page_hash)
+                    if cached is not None:
+                        page_texts[index] = cached
+                        stats["ocr_cached_pages"] += 1
+                    else:
+                        future = _get_ocr_pool().submit(_ocr_page, page_pdf, config.OCR_DPI, config.OCR_LANGUAGE)
+                        pending[index] = (page_hash, future)
+
+                for index, (page_hash, future) in pending.items():
+                    try:
+                        ocr_text = future.result()
+                    except Exception:
+                        stats["ocr_failed_pages"] += 1
+                        continue
+                    _ocr_cache.set(page_hash, ocr_text)
+                    page_texts[index] = ocr_text
+                    stats["ocr_pages"] += 1
+
+                stats["ocr_time_ms"] = int((time.perf_counter() - ocr_started) * 1000)
+
+            stats["extraction_time_ms"] = int((time.perf_counter() - started) * 1000)
+
+            return {
+                "text": "\n".join(page_texts).strip(),
+                "extraction": stats
+            }
         except Exception as e:
             raise Exception(f"Error extracting text from PDF: {str(e)}")
 
+    @staticmethod
+    def extract_text_from_pdf(file_bytes: bytes) -> str:
+        """Extract text from PDF file"""
+        return DocumentProcessor.extract_pdf(file_bytes)["text"]
+
     @staticmethod
     def extract_text_from_docx(file_bytes: bytes) -> str:
         """Extract text from DOCX file"""
@@ -48,18 +147,26 @@ class DocumentProcessor:
     def process_document(file_bytes: bytes, file_type: str) -> Dict[str, Any]:
         """Process document based on file type"""
         file_type = file_type.lower()
+        extraction = {}
+
+        with span("document.process", **{"document.type": file_type, "document.bytes": len(file_bytes)}) as current:
+            if file_type in ['pdf', 'application/pdf']:
+                pdf = DocumentProcessor.extract_pdf(file_bytes)
+                text = pdf["text"]
+                extraction = pdf["extraction"]
+            elif file_type in ['docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
+                text = DocumentProcessor.extract_text_from_docx(file_bytes)
+            elif file_type in ['txt', 'text/plain']:
+                text = DocumentProcessor.extract_text_from_txt(file_bytes)
+            else:
+                raise Exception(f"Unsupported file type: {file_type}")
 
-        if file_type in ['pdf', 'application/pdf']:
-            text = DocumentProcessor.extract_text_from_pdf(file_bytes)
-        elif file_type in ['docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
-            text = DocumentProcessor.extract_text_from_docx(file_bytes)
-        elif file_type in ['txt', 'text/plain']:
-            text = DocumentProcessor.extract_text_from_txt(file_bytes)
-        else:
-            raise Exception(f"Unsupported file type: {file_type}")
+            current.set_attribute("document.chars", len(text))
+            current.set_attributes({f"document.{key}": value for key, value in extraction.items()})
 
         return {
             "text": text,
             "word_count": len(text.split()),
-            "char_count": len(text)
+            "char_count": len(text),
+            "extraction": extraction
         }
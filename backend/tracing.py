@@ -0,0 +1,103 @@
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from config import config
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+except ImportError:
+    trace = None
+
+
+class _NoopSpan:
+    """Stand-in span used when tracing is disabled or OpenTelemetry is not installed"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+
+class _ProcessFile:
+    """Append-only file opened lazily per process at <path>.<pid>
+
+    Under serve.py tracing is set up in the gunicorn master before forking;
+    a handle opened there would be shared by every worker and their batched
+    writes could interleave mid-line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._pid = None
+
+    def write(self, text: str) -> int:
+        if self._pid != os.getpid():
+            self._file = open(f"{self.path}.{os.getpid()}", "a")
+            self._pid = os.getpid()
+        return self._file.write(text)
+
+    def flush(self) -> None:
+        if self._file is not None and self._pid == os.getpid():
+            self._file.flush()
+
+
+_tracer = None
+
+
+def setup_tracing() -> bool:
+    """Configure the global tracer provider and exporter, returning whether tracing is active"""
+    global _tracer
+    if not config.TRACING_ENABLED or trace is None:
+        return False
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": config.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(config.TRACING_SAMPLE_RATIO))
+    )
+
+    if config.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    else:
+        exporter = ConsoleSpanExporter(
+            out=_ProcessFile(config.TRACING_FILE),
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("legal_ai")
+    return True
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Open a span as a child of the current one; a no-op when tracing is off"""
+    if _tracer is None:
+        yield _NoopSpan()
+        return
+
+    with _tracer.start_as_current_span(name) as current:
+        current.set_attributes({key: value for key, value in attributes.items() if value is not None})
+        yield current
+
+
+def traced_execute(query, table: str, operation: str):
+    """Execute a Supabase query builder inside a database span"""
+    with span(
+        f"supabase.{operation}",
+        **{"db.system": "postgresql", "db.sql.table": table, "db.operation": operation}
+    ) as current:
+        result = query.execute()
+        current.set_attribute("db.rows", len(result.data or []))
+        return result
@@ -0,0 +1,238 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from tracing import traced_execute
+
+logger = logging.getLogger("legal_ai.write_behind")
+
+# Parent tables first so foreign keys resolve when a batch holds both a row
+# and its children; tables not listed are written last.
+TABLE_ORDER = [
+    "conversations",
+    "documents",
+    "messages",
+    "legal_research",
+    "document_analysis",
+    "agent_tasks"
+]
+
+# Error codes that retrying cannot fix: PostgreSQL bad data, constraint
+# violations and schema errors (SQLSTATE classes 22, 23, 42), and PostgREST
+# request and schema-cache errors (PGRST1xx, PGRST2xx, e.g. unknown column).
+PERMANENT_ERROR_CODES = ("22", "23", "42", "PGRST1", "PGRST2")
+
+
+class WriteBehindQueue:
+    """Buffer inserts in memory and write them to Supabase as multi-row batches from a background thread"""
+
+    def __init__(self, client, max_batch: int, flush_interval_ms: int, max_retries: int, spill_path: str):
+        self.client = client
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_retries = max_retries
+        self.spill_path = spill_path
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._replay_paths: List[str] = []
+
+    def start(self) -> None:
+        """Replay any spilled records and start the flush thread"""
+        self._replay_spill()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._loop, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread after writing everything still buffered"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def enqueue(self, table: str, record: Dict[str, Any]) -> None:
+        """Accept a row for insertion; returns immediately"""
+        # Every table is keyed by a uuid; assigning it here makes retries and
+        # replays idempotent, since already-written rows are skipped on conflict
+        record = {"id": str(uuid.uuid4()), **record}
+        with self._condition:
+            self._pending.append((table, record))
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._condition:
+                if not self._stopping and len(self._pending) < self.max_batch:
+                    self._condition.wait(self.flush_interval)
+                batch, self._pending = self._pending, []
+                stopping = self._stopping
+            flushed = self._flush_safely(batch) if batch else True
+            if self._replay_paths and flushed:
+                # Replayed rows are now written, re-spilled or dead-lettered;
+                # after a failed flush the files stay for the next startup
+                for path in self._replay_paths:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                self._replay_paths = []
+            if stopping:
+                with self._condition:
+                    batch, self._pending = self._pending, []
+                if batch:
+                    self._flush_safely(batch)
+                return
+
+    def _flush_safely(self, batch: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        # An unexpected error (a full disk while spilling, a bad record) must
+        # not kill the flush thread and silently buffer every later write
+        try:
+            self._flush(batch)
+            return True
+        except Exception:
+            logger.exception("write-behind flush of %d rows failed", len(batch))
+            return False
+
+    def _flush(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        # Group rows by table and column set, then write the groups in table
+        # dependency order (rows keep their arrival order within a group).
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for table, record in batch:
+            groups.setdefault((table, tuple(sorted(record))), []).append(record)
+
+        def rank(group_key: Tuple[str, Tuple[str, ...]]) -> int:
+            table = group_key[0]
+            return TABLE_ORDER.index(table) if table in TABLE_ORDER else len(TABLE_ORDER)
+
+        for group_key in sorted(groups, key=rank):
+            table, rows = group_key[0], groups[group_key]
+            for start in range(0, len(rows), self.max_batch):
+                self._write(table, rows[start:start + self.max_batch])
+
+    def _write(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        # A chunk the database rejects is retried row by row so one bad row
+        # (say, a message for a missing conversation) cannot sink the rest
+        error = self._insert(table, rows)
+        if error is None:
+            return
+        if not _is_permanent(error):
+            self._spill(table, rows)
+        elif len(rows) == 1:
+            self._dead_letter(table, rows[0], error)
+        else:
+            for row in rows:
+                self._write(table, [row])
+
+    def _insert(self, table: str, rows: List[Dict[str, Any]]) -> Optional[Exception]:
+        # Rows with an id are upserted ignoring duplicates, so retrying after
+        # a commit whose response was lost does not fail on the primary key
+        operation = "upsert" if "id" in rows[0] else "insert"
+        for attempt in range(self.max_retries + 1):
+            try:
+                query = self.client.table(table)
+                query = query.upsert(rows, ignore_duplicates=True) if operation == "upsert" else query.insert(rows)
+                traced_execute(query, table, operation)
+                return None
+            except Exception as e:
+                logger.warning("bulk %s of %d rows into %s failed (attempt %d): %s", operation, len(rows), table, attempt + 1, e)
+                if _is_permanent(e):
+                    return e
+                error = e
+                if attempt < self.max_retries:
+                    time.sleep(min(2 ** attempt * 0.1, 5))
+        return error
+
+    def _dead_letter(self, table: str, row: Dict[str, Any], error: Exception) -> None:
+        # Rows the database will never accept are kept out of the spill file,
+        # which would otherwise replay them on every startup
+        path = f"{self.spill_path}.dead-letter.{os.getpid()}"
+        with open(path, "a") as dead_letter:
+            dead_letter.write(json.dumps({"table": table, "record": row, "error": str(error)}) + "\n")
+        logger.error("rejected row for %s written to %s: %s", table, path, error)
+
+    def _spill(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        path = self._own_spill_path()
+        with open(path, "a") as spill:
+            for row in rows:
+                spill.write(json.dumps({"table": table, "record": row}) + "\n")
+            spill.flush()
+            os.fsync(spill.fileno())
+        logger.error("spilled %d rows for %s to %s", len(rows), table, path)
+
+    def _own_spill_path(self) -> str:
+        # One spill file per process so workers sharing spill_path never
+        # append to, or replay, each other's files
+        return f"{self.spill_path}.{os.getpid()}"
+
+    def _claimable_spill_files(self) -> List[str]:
+        directory = os.path.dirname(self.spill_path) or "."
+        pattern = re.compile(rf"^{re.escape(os.path.basename(self.spill_path))}(?:\.(\d+)(?:\.replay-\d+)?)?$")
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+
+        claimable = []
+        for name in names:
+            match = pattern.match(name)
+            if not match:
+                continue
+            # Files of live workers are still being written; our own pid can
+            # only match leftovers of an earlier process that reused it.
+            pid = int(match.group(1)) if match.group(1) else None
+            if pid is None or pid == os.getpid() or not _pid_alive(pid):
+                claimable.append(os.path.join(directory, name))
+        return claimable
+
+    def _replay_spill(self) -> None:
+        # Files are claimed with an atomic rename; when several workers start
+        # at once exactly one rename succeeds and the others skip the file.
+        entries = []
+        for path in sorted(self._claimable_spill_files(), key=_mtime):
+            claimed = f"{self._own_spill_path()}.replay-{time.time_ns()}"
+            try:
+                os.rename(path, claimed)
+                with open(claimed) as replay:
+                    entries.extend(json.loads(line) for line in replay if line.strip())
+            except FileNotFoundError:
+                continue
+            self._replay_paths.append(claimed)
+
+        if not entries:
+            return
+
+        with self._condition:
+            self._pending = [(entry["table"], entry["record"]) for entry in entries] + self._pending
+        logger.info("replaying %d spilled rows", len(entries))
+
+
+def _is_permanent(error: Exception) -> bool:
+    code = str(getattr(error, "code", "") or "")
+    return code.startswith(PERMANENT_ERROR_CODES)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0.0
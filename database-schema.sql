@@ -66,6 +66,12 @@
   - tokens_used, cost
   - model_used, timestamp
 
+  ### 10. user_dashboard_stats
+  Per-user dashboard aggregates, maintained by insert/delete triggers
+  - conversation counts by type
+  - documents uploaded/processed
+  - analyses by type, tokens used
+
   ## Security
   - RLS enabled on all tables
   - Users can only access their own data
@@ -400,3 +406,270 @@ CREATE TRIGGER update_conversations_updated_at BEFORE UPDATE ON conversations
 
 CREATE TRIGGER update_documents_updated_at BEFORE UPDATE ON documents
   FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Dashboard Stats Table
+-- Per-user aggregates maintained incrementally by insert/delete triggers so the
+-- dashboard can load its totals with a single-row lookup.
+CREATE TABLE IF NOT EXISTS user_dashboard_stats (
+  user_id uuid PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+  total_conversations integer NOT NULL DEFAULT 0,
+  conversations_by_type jsonb NOT NULL DEFAULT '{}',
+  documents_uploaded integer NOT NULL DEFAULT 0,
+  documents_processed integer NOT NULL DEFAULT 0,
+  total_analyses integer NOT NULL DEFAULT 0,
+  analyses_by_type jsonb NOT NULL DEFAULT '{}',
+  tokens_used bigint NOT NULL DEFAULT 0,
+  updated_at timestamptz DEFAULT now()
+);
+
+ALTER TABLE user_dashboard_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own dashboard stats"
+  ON user_dashboard_stats FOR SELECT
+  TO authenticated
+  USING (auth.uid() = user_id);
+
+-- Increment a counter stored under `key` in a jsonb object
+CREATE OR REPLACE FUNCTION jsonb_increment(counts jsonb, key text, amount integer DEFAULT 1)
+RETURNS jsonb AS $$
+BEGIN
+  RETURN jsonb_set(
+    COALESCE(counts, '{}'::jsonb),
+    ARRAY[key],
+    to_jsonb(COALESCE((counts ->> key)::integer, 0) + amount)
+  );
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Decrement a counter stored under `key`, dropping the key when it reaches zero
+CREATE OR REPLACE FUNCTION jsonb_decrement(counts jsonb, key text)
+RETURNS jsonb AS $$
+BEGIN
+  IF COALESCE((counts ->> key)::integer, 0) <= 1 THEN
+    RETURN COALESCE(counts, '{}'::jsonb) - key;
+  END IF;
+  RETURN jsonb_increment(counts, key, -1);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION stats_on_conversation_insert()
+RETURNS TRIGGER
+SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+  INSERT INTO user_dashboard_stats (user_id, total_conversations, conversations_by_type)
+  VALUES (NEW.user_id, 1, jsonb_build_object(COALESCE(NEW.conversation_type, 'general'), 1))
+  ON CONFLICT (user_id) DO UPDATE SET
+    total_conversations = user_dashboard_stats.total_conversations + 1,
+    conversations_by_type = jsonb_increment(
+      user_dashboard_stats.conversations_by_type,
+      COALESCE(NEW.conversation_type, 'general')
+    ),
+    updated_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stats_on_document_insert()
+RETURNS TRIGGER
+SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+  INSERT INTO user_dashboard_stats (user_id, documents_uploaded, documents_processed)
+  VALUES (NEW.user_id, 1, CASE WHEN NEW.processed THEN 1 ELSE 0 END)
+  ON CONFLICT (user_id) DO UPDATE SET
+    documents_uploaded = user_dashboard_stats.documents_uploaded + 1,
+    documents_processed = user_dashboard_stats.documents_processed
+      + CASE WHEN NEW.processed THEN 1 ELSE 0 END,
+    updated_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stats_on_document_processed()
+RETURNS TRIGGER
+SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+  UPDATE user_dashboard_stats
+  SET documents_processed = documents_processed + 1, updated_at = now()
+  WHERE user_id = NEW.user_id;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stats_on_analysis_insert()
+RETURNS TRIGGER
+SECURITY DEFINER SET search_path = public AS $$
+DECLARE
+  owner_id uuid;
+BEGIN
+  SELECT user_id INTO owner_id FROM documents WHERE id = NEW.document_id;
+
+  INSERT INTO user_dashboard_stats (user_id, total_analyses, analyses_by_type)
+  VALUES (owner_id, 1, jsonb_build_object(NEW.analysis_type, 1))
+  ON CONFLICT (user_id) DO UPDATE SET
+    total_analyses = user_dashboard_stats.total_analyses + 1,
+    analyses_by_type = jsonb_increment(user_dashboard_stats.analyses_by_type, NEW.analysis_type),
+    updated_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stats_on_usage_insert()
+RETURNS TRIGGER
+SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+  INSERT INTO user_dashboard_stats (user_id, tokens_used)
+  VALUES (NEW.user_id, NEW.tokens_used)
+  ON CONFLICT (user_id) DO UPDATE SET
+    tokens_used = user_dashboard_stats.tokens_used + NEW.tokens_used,
+    updated_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stats_on_conversation_delete()
+RETURNS TRIGGER
+SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+  UPDATE user_dashboard_stats SET
+    total_conversations = GREATEST(total_conversations - 1, 0),
+    conversations_by_type = jsonb_decrement(conversations_by_type, COALESCE(OLD.conversation_type, 'general')),
+    updated_at = now()
+  WHERE user_id = OLD.user_id;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Runs BEFORE the delete so the document's analyses can still be counted;
+-- once the row is gone the cascaded document_analysis deletes cannot find
+-- their owner and are skipped by stats_on_analysis_delete.
+CREATE OR REPLACE FUNCTION stats_on_document_delete()
+RETURNS TRIGGER
+SECURITY DEFINER SET search_path = public AS $$
+DECLARE
+  analysis RECORD;
+BEGIN
+  UPDATE user_dashboard_stats SET
+    documents_uploaded = GREATEST(documents_uploaded - 1, 0),
+    documents_processed = GREATEST(documents_processed - CASE WHEN OLD.processed THEN 1 ELSE 0 END, 0),
+    updated_at = now()
+  WHERE user_id = OLD.user_id;
+
+  FOR analysis IN
+    SELECT analysis_type, COUNT(*)::integer AS n
+    FROM document_analysis WHERE document_id = OLD.id
+    GROUP BY analysis_type
+  LOOP
+    UPDATE user_dashboard_stats SET
+      total_analyses = GREATEST(total_analyses - analysis.n, 0),
+      analyses_by_type = CASE
+        WHEN COALESCE((analyses_by_type ->> analysis.analysis_type)::integer, 0) <= analysis.n
+          THEN analyses_by_type - analysis.analysis_type
+        ELSE jsonb_increment(analyses_by_type, analysis.analysis_type, -analysis.n)
+      END,
+      updated_at = now()
+    WHERE user_id = OLD.user_id;
+  END LOOP;
+
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stats_on_analysis_delete()
+RETURNS TRIGGER
+SECURITY DEFINER SET search_path = public AS $$
+DECLARE
+  owner_id uuid;
+BEGIN
+  SELECT user_id INTO owner_id FROM documents WHERE id = OLD.document_id;
+
+  IF owner_id IS NOT NULL THEN
+    UPDATE user_dashboard_stats SET
+      total_analyses = GREATEST(total_analyses - 1, 0),
+      analyses_by_type = jsonb_decrement(analyses_by_type, OLD.analysis_type),
+      updated_at = now()
+    WHERE user_id = owner_id;
+  END IF;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION stats_on_usage_delete()
+RETURNS TRIGGER
+SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+  UPDATE user_dashboard_stats SET
+    tokens_used = GREATEST(tokens_used - OLD.tokens_used, 0),
+    updated_at = now()
+  WHERE user_id = OLD.user_id;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER update_stats_on_conversation_insert AFTER INSERT ON conversations
+  FOR EACH ROW EXECUTE FUNCTION stats_on_conversation_insert();
+
+CREATE TRIGGER update_stats_on_document_insert AFTER INSERT ON documents
+  FOR EACH ROW EXECUTE FUNCTION stats_on_document_insert();
+
+CREATE TRIGGER update_stats_on_document_processed AFTER UPDATE OF processed ON documents
+  FOR EACH ROW WHEN (NEW.processed AND NOT COALESCE(OLD.processed, false))
+  EXECUTE FUNCTION stats_on_document_processed();
+
+CREATE TRIGGER update_stats_on_analysis_insert AFTER INSERT ON document_analysis
+  FOR EACH ROW EXECUTE FUNCTION stats_on_analysis_insert();
+
+CREATE TRIGGER update_stats_on_usage_insert AFTER INSERT ON usage_analytics
+  FOR EACH ROW EXECUTE FUNCTION stats_on_usage_insert();
+
+CREATE TRIGGER update_stats_on_conversation_delete AFTER DELETE ON conversations
+  FOR EACH ROW EXECUTE FUNCTION stats_on_conversation_delete();
+
+CREATE TRIGGER update_stats_on_document_delete BEFORE DELETE ON documents
+  FOR EACH ROW EXECUTE FUNCTION stats_on_document_delete();
+
+CREATE TRIGGER update_stats_on_analysis_delete AFTER DELETE ON document_analysis
+  FOR EACH ROW EXECUTE FUNCTION stats_on_analysis_delete();
+
+CREATE TRIGGER update_stats_on_usage_delete AFTER DELETE ON usage_analytics
+  FOR EACH ROW EXECUTE FUNCTION stats_on_usage_delete();
+
+-- Backfill aggregates for data that existed before the triggers were installed
+INSERT INTO user_dashboard_stats (
+  user_id, total_conversations, conversations_by_type, documents_uploaded,
+  documents_processed, total_analyses, analyses_by_type, tokens_used
+)
+SELECT
+  u.id,
+  COALESCE(c.total, 0),
+  COALESCE(c.by_type, '{}'),
+  COALESCE(d.uploaded, 0),
+  COALESCE(d.processed, 0),
+  COALESCE(a.total, 0),
+  COALESCE(a.by_type, '{}'),
+  COALESCE(t.tokens, 0)
+FROM auth.users u
+LEFT JOIN (
+  SELECT user_id, SUM(n)::integer AS total, jsonb_object_agg(conversation_type, n) AS by_type
+  FROM (
+    SELECT user_id, COALESCE(conversation_type, 'general') AS conversation_type, COUNT(*) AS n
+    FROM conversations GROUP BY 1, 2
+  ) grouped
+  GROUP BY user_id
+) c ON c.user_id = u.id
+LEFT JOIN (
+  SELECT user_id, COUNT(*)::integer AS uploaded, COUNT(*) FILTER (WHERE processed)::integer AS processed
+  FROM documents GROUP BY user_id
+) d ON d.user_id = u.id
+LEFT JOIN (
+  SELECT user_id, SUM(n)::integer AS total, jsonb_object_agg(analysis_type, n) AS by_type
+  FROM (
+    SELECT documents.user_id, document_analysis.analysis_type, COUNT(*) AS n
+    FROM document_analysis JOIN documents ON documents.id = document_analysis.document_id
+    GROUP BY 1, 2
+  ) grouped
+  GROUP BY user_id
+) a ON a.user_id = u.id
+LEFT JOIN (
+  SELECT user_id, SUM(tokens_used)::bigint AS tokens FROM usage_analytics GROUP BY user_id
+) t ON t.user_id = u.id
+ON CONFLICT (user_id) DO NOTHING;
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Sidebar } from '../Sidebar/Sidebar';
 import { ChatInterface } from '../Chat/ChatInterface';
 import { useAuth } from '../../contexts/AuthContext';
-import { Conversation, Message, ConversationType } from '../../types';
+import { Conversation, Message, ConversationType, DashboardStats } from '../../types';
 import { supabase } from '../../lib/supabase';
 
 const BACKEND_URL = 'http://localhost:8000';
@@ -14,10 +14,12 @@ export function Dashboard() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [loading, setLoading] = useState(false);
   const [isMobileMenuOpen, setIsMobileMenuOpen] = useState(false);
+  const [stats, setStats] = useState<DashboardStats | null>(null);
 
   useEffect(() => {
     if (user) {
       loadConversations();
+      loadStats();
     }
   }, [user]);
 
@@ -42,6 +44,21 @@ export function Dashboard() {
     }
   };
 
+  const loadStats = async () => {
+    try {
+      const response = await fetch(`${BACKEND_URL}/api/stats/${user!.id}`);
+
+      if (!response.ok) {
+        throw new Error('Failed to load stats');
+      }
+
+      const data = await response.json();
+      setStats(data.stats);
+    } catch (error) {
+      console.error('Error loading stats:', error);
+    }
+  };
+
   const loadMessages = async (conversationId: string) => {
     try {
       const { data, error } = await supabase
@@ -75,6 +92,7 @@ export function Dashboard() {
       setConversations([data, ...conversations]);
       setActiveConversationId(data.id);
       setMessages([]);
+      loadStats();
     } catch (error) {
       console.error('Error creating conversation:', error);
     }
@@ -189,6 +207,21 @@ export function Dashboard() {
                 Start a new conversation to get legal information, review contracts, conduct
                 research, or assess compliance and risks.
               </p>
+              {stats && (
+                <div className="grid grid-cols-2 sm:grid-cols-4 gap-4 mb-8">
+                  {[
+                    { label: 'Conversations', value: stats.total_conversations },
+                    { label: 'Documents Processed', value: stats.documents_processed },
+                    { label: 'Analyses', value: stats.total_analyses },
+                    { label: 'Tokens Used', value: stats.tokens_used.toLocaleString() }
+                  ].map((item) => (
+                    <div key={item.label} className="bg-slate-800 rounded-lg p-4">
+                      <div className="text-2xl font-semibold text-white">{item.value}</div>
+                      <div className="text-slate-400 text-sm">{item.label}</div>
+                    </div>
+                  ))}
+                </div>
+              )}
               <p className="text-slate-500 text-sm">
                 This AI assistant provides legal information, not legal advice. Always consult with
                 a licensed attorney for specific legal matters.
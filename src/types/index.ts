@@ -40,6 +40,17 @@ export interface DocumentAnalysis {
   created_at: string;
 }
 
+export interface DashboardStats {
+  user_id: string;
+  total_conversations: number;
+  conversations_by_type: Record<string, number>;
+  documents_uploaded: number;
+  documents_processed: number;
+  total_analyses: number;
+  analyses_by_type: Record<string, number>;
+  tokens_used: number;
+}
+
 export type ConversationType =
   | 'general'
   | 'contract_review'
@@ -53,4 +64,5 @@ export type AnalysisType =
   | 'clause_extraction'
   | 'risk_assessment'
   | 'compliance_check'
-  | 'document_analysis';
+  | 'document_analysis'
+  | 'key_terms';